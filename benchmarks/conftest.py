@@ -0,0 +1,54 @@
+import pytest
+
+from synthetic import make_dataset
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("smallgenomeutilities benchmarks")
+    group.addoption(
+        "--bench-scales",
+        default="1,10,100",
+        help="comma-separated depth multipliers to benchmark (default: %(default)s)",
+    )
+    group.addoption(
+        "--bench-depth",
+        default=10,
+        type=int,
+        help="read pairs per amplicon at scale 1 (default: %(default)s)",
+    )
+    group.addoption(
+        "--bench-length",
+        default=3000,
+        type=int,
+        help="length of the synthetic reference (default: %(default)s)",
+    )
+    group.addoption(
+        "--bench-rounds",
+        default=3,
+        type=int,
+        help="rounds per benchmark (default: %(default)s)",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "scale" in metafunc.fixturenames:
+        scales = [int(s) for s in metafunc.config.getoption("--bench-scales").split(",")]
+        metafunc.parametrize("scale", scales, ids=[f"{s}x" for s in scales], scope="session")
+
+
+@pytest.fixture(scope="session")
+def dataset(request, scale, tmp_path_factory):
+    """Synthetic dataset at the requested depth scale, generated once per session"""
+    config = request.config
+    return make_dataset(
+        tmp_path_factory.mktemp(f"data_{scale}x"),
+        depth=config.getoption("--bench-depth") * scale,
+        genome_length=config.getoption("--bench-length"),
+        # the MSA grows with the scale too
+        num_contigs=2 + 2 * scale,
+    )
+
+
+@pytest.fixture
+def rounds(request):
+    return request.config.getoption("--bench-rounds")
@@ -0,0 +1,71 @@
+"""
+Helpers shared by the benchmarks: loading scripts, measuring memory and
+reporting throughputs
+"""
+
+import importlib.machinery
+import importlib.util
+import multiprocessing
+import os
+import resource
+import subprocess
+import sys
+from pathlib import Path
+
+# Get path to scripts
+script_dir = Path(__file__).parent.joinpath("..", "scripts")
+
+
+def load_script(name):
+    """Import a script file as a module"""
+    loader = importlib.machinery.SourceFileLoader(name, str(script_dir.joinpath(name)))
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def _child_peak_rss(func, conn):
+    func()
+    conn.send(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    conn.close()
+
+
+def peak_rss(func):
+    """
+    Run func once in a forked process and return its peak RSS in MiB
+    (NOTE: includes the memory of the benchmark process at the time of the fork)
+    """
+    ctx = multiprocessing.get_context("fork")
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_child_peak_rss, args=(func, child_conn))
+    proc.start()
+    maxrss = parent_conn.recv()
+    proc.join()
+    return maxrss / 1024  # Linux reports KiB
+
+
+def run_script(args):
+    """Run a script as a sub-process, return its peak RSS in MiB"""
+    proc = subprocess.Popen(
+        [sys.executable, str(script_dir.joinpath(args[0]))] + [str(a) for a in args[1:]],
+        stdout=subprocess.DEVNULL,
+    )
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    assert proc.returncode == 0, f"{args[0]} failed with {proc.returncode}"
+    return rusage.ru_maxrss / 1024
+
+
+def report(benchmark, rss=None, **counters):
+    """
+    Attach throughputs (counter per second, from the mean time) and peak RSS
+    to the benchmark results, see --benchmark-json
+    """
+    mean = benchmark.stats.stats.mean
+    for name, count in counters.items():
+        benchmark.extra_info[name] = count
+        benchmark.extra_info[f"{name}/s"] = count / mean
+    if rss is not None:
+        benchmark.extra_info["peak_rss_MiB"] = rss
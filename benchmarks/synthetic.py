@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+
+"""
+Deterministic generator of synthetic data for the benchmarks:
+references, MSAs, amplicon-style alignments and paired FASTQs.
+
+The same seed always produces the same files, thus results are comparable
+between runs and between machines. It can also be used on its own to
+write a dataset in a directory:
+
+    python benchmarks/synthetic.py --depth 100 OUTDIR
+"""
+
+import argparse
+import gzip
+import os
+import random
+
+import pysam
+
+BASES = "ACGT"
+
+
+def random_reference(length, seed=0):
+    """Return a random nucleotide sequence"""
+    rng = random.Random(seed)
+    return "".join(rng.choice(BASES) for _ in range(length))
+
+
+def write_fasta(path, records, width=60):
+    """Write (id, sequence) pairs into a FASTA file"""
+    with open(path, "wt") as f:
+        for name, seq in records:
+            f.write(f">{name}\n")
+            for i in range(0, len(seq), width):
+                f.write(f"{seq[i:i + width]}\n")
+
+
+def make_msa(reference, num_contigs, seed=0, subst_rate=0.02, indel_rate=0.002):
+    """
+    Return a list of aligned sequences, derived from the reference with
+    substitutions, deletions and insertions. The first one is the reference
+    itself (with gaps at the insertions of the other contigs)
+    """
+    rng = random.Random(seed)
+    columns = []
+    for base in reference:
+        # one column of the reference, and maybe an insertion column after it
+        column = [base] + [
+            "-" if rng.random() < indel_rate
+            else (rng.choice(BASES) if rng.random() < subst_rate else base)
+            for _ in range(num_contigs - 1)
+        ]
+        columns.append(column)
+        if rng.random() < indel_rate:
+            columns.append(["-"] + [
+                rng.choice(BASES) if rng.random() < 0.5 else "-"
+                for _ in range(num_contigs - 1)
+            ])
+
+    return ["".join(col[i] for col in columns) for i in range(num_contigs)]
+
+
+def amplicons(length, amplicon_len=400, overlap=75):
+    """Return the [start, end) of tiled amplicons covering the reference"""
+    step = amplicon_len - overlap
+    return [(start, min(start + amplicon_len, length)) for start in range(0, length - overlap, step)]
+
+
+def _mutate_read(rng, template, read_len, error_rate, del_rate):
+    """Return the query sequence and the cigar of a read taken from template"""
+    query = []
+    cigar = []
+    pos = 0
+    while len(query) < read_len and pos < len(template):
+        if 5 < len(query) < read_len - 5 and rng.random() < del_rate:
+            # short deletion
+            dlen = rng.randint(1, 3)
+            cigar.append((pysam.CDEL, dlen))
+            pos += dlen
+            continue
+        base = template[pos]
+        query.append(rng.choice(BASES) if rng.random() < error_rate else base)
+        cigar.append((pysam.CMATCH, 1))
+        pos += 1
+
+    # run-length encode the cigar
+    rle = []
+    for op, n in cigar:
+        if rle and rle[-1][0] == op:
+            rle[-1] = (op, rle[-1][1] + n)
+        else:
+            rle.append((op, n))
+    return "".join(query), rle, pos
+
+
+def make_read_pairs(ref_name, reference, depth, read_len=150, amplicon_len=400, seed=0,
+                    error_rate=0.005, del_rate=0.001):
+    """
+    Return a list of read pairs (as dict of fields), `depth` pairs per
+    amplicon: R1 forward from the amplicon start, R2 reverse from its end
+    """
+    rng = random.Random(seed)
+    pairs = []
+    n = 0
+    for amp_start, amp_end in amplicons(len(reference), amplicon_len):
+        for _ in range(depth):
+            name = f"read{n:08d}"
+            n += 1
+            seq1, cig1, span1 = _mutate_read(rng, reference[amp_start:amp_end], read_len, error_rate, del_rate)
+            # R2: taken backward from the amplicon end
+            seq2, cig2, span2 = _mutate_read(rng, reference[amp_start:amp_end][::-1], read_len, error_rate, del_rate)
+            seq2, cig2 = seq2[::-1], cig2[::-1]
+            start2 = amp_end - span2
+            tlen = amp_end - amp_start
+            qual1 = [rng.randint(30, 40) for _ in seq1]
+            qual2 = [rng.randint(30, 40) for _ in seq2]
+            pairs.append((
+                dict(name=name, flag=99, start=amp_start, cigar=cig1, seq=seq1, qual=qual1, mate=start2, tlen=tlen),
+                dict(name=name, flag=147, start=start2, cigar=cig2, seq=seq2, qual=qual2, mate=amp_start, tlen=-tlen),
+            ))
+    return pairs
+
+
+def write_alignment(path, ref_name, reference, pairs, sort="coordinate"):
+    """
+    Write the read pairs into a SAM/BAM file (depending on extension),
+    sorted by coordinate (and indexed, for BAM) or by name
+    """
+    header = {
+        "HD": {"VN": "1.6", "SO": "queryname" if sort == "name" else "coordinate"},
+        "SQ": [{"SN": ref_name, "LN": len(reference)}],
+    }
+    reads = [r for pair in pairs for r in pair]
+    if sort == "name":
+        reads.sort(key=lambda r: (r["name"], r["flag"]))
+    else:
+        reads.sort(key=lambda r: (r["start"], r["name"], r["flag"]))
+
+    binary = os.path.splitext(path)[1] == ".bam"
+    with pysam.AlignmentFile(path, "wb" if binary else "w", header=header) as out:
+        for r in reads:
+            a = pysam.AlignedSegment(out.header)
+            a.query_name = r["name"]
+            a.flag = r["flag"]
+            a.reference_id = 0
+            a.reference_start = r["start"]
+            a.mapping_quality = 60
+            a.cigartuples = r["cigar"]
+            a.next_reference_id = 0
+            a.next_reference_start = r["mate"]
+            a.template_length = r["tlen"]
+            a.query_sequence = r["seq"]
+            a.query_qualities = pysam.qualitystring_to_array("".join(chr(q + 33) for q in r["qual"]))
+            out.write(a)
+
+    if binary and sort != "name":
+        pysam.index(path)
+
+
+def write_paired_fastq(path1, path2, num_pairs, read_len=150, seed=0):
+    """
+    Write gzipped paired FASTQ files, with qualities degrading toward the
+    ends of the reads (as seen on Illumina) so that trimming has work to do
+    """
+    rng = random.Random(seed)
+    with gzip.open(path1, "wt") as f1, gzip.open(path2, "wt") as f2:
+        for n in range(num_pairs):
+            for f in (f1, f2):
+                seq = "".join(rng.choice(BASES) for _ in range(read_len))
+                drop = rng.randint(read_len // 2, read_len)
+                qual = "".join(
+                    chr(33 + (rng.randint(30, 40) if i < drop else rng.randint(2, 25)))
+                    for i in range(read_len)
+                )
+                f.write(f"@pair{n:08d}\n{seq}\n+\n{qual}\n")
+
+
+def make_dataset(outdir, depth=10, genome_length=3000, num_contigs=4, seed=0):
+    """
+    Write a complete dataset in outdir, return a dict of paths and sizes
+    """
+    os.makedirs(outdir, exist_ok=True)
+    ref_name = "synthetic"
+    reference = random_reference(genome_length, seed)
+
+    data = {"ref_name": ref_name, "genome_length": genome_length, "depth": depth}
+
+    data["reference"] = os.path.join(outdir, "reference.fasta")
+    write_fasta(data["reference"], [(ref_name, reference)])
+
+    msa = make_msa(reference, num_contigs, seed)
+    data["msa"] = os.path.join(outdir, "msa.fasta")
+    data["contigs"] = [ref_name] + [f"contig{i}" for i in range(1, num_contigs)]
+    write_fasta(data["msa"], zip(data["contigs"], msa))
+    data["msa_columns"] = len(msa[0])
+
+    pairs = make_read_pairs(ref_name, reference, depth, seed=seed)
+    data["pairs"] = len(pairs)
+    data["reads"] = 2 * len(pairs)
+    data["bam"] = os.path.join(outdir, "reads.bam")
+    write_alignment(data["bam"], ref_name, reference, pairs)
+    data["namesorted_sam"] = os.path.join(outdir, "reads.namesorted.sam")
+    write_alignment(data["namesorted_sam"], ref_name, reference, pairs, sort="name")
+
+    data["fastq"] = (os.path.join(outdir, "reads_R1.fastq.gz"), os.path.join(outdir, "reads_R2.fastq.gz"))
+    write_paired_fastq(*data["fastq"], num_pairs=len(pairs), seed=seed)
+
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark data",
+                                     formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("-d", "--depth", default=10, type=int, metavar="INT",
+                        help="read pairs per amplicon")
+    parser.add_argument("-l", "--length", default=3000, type=int, metavar="INT",
+                        help="length of the reference")
+    parser.add_argument("-n", "--contigs", default=4, type=int, metavar="INT",
+                        help="number of contigs in the MSA")
+    parser.add_argument("-s", "--seed", default=0, type=int, metavar="INT",
+                        help="random seed")
+    parser.add_argument("OUTDIR", help="output directory")
+    args = parser.parse_args()
+
+    data = make_dataset(args.OUTDIR, args.depth, args.length, args.contigs, args.seed)
+    for k, v in data.items():
+        print(f"{k}\t{v}")
+
+
+if __name__ == "__main__":
+    main()
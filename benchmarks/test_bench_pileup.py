@@ -0,0 +1,26 @@
+import pysam
+
+from helpers import peak_rss, report
+from smallgenomeutilities.__pileup__ import get_aln_counts, get_cnt_matrix
+
+
+def test_get_cnt_matrix(benchmark, dataset, rounds):
+    def run():
+        with pysam.AlignmentFile(dataset["bam"], "rb") as alnfile:
+            return get_cnt_matrix(alnfile, dataset["ref_name"])
+
+    _, reads, _, rlen_tot = benchmark.pedantic(run, rounds=rounds, iterations=1)
+    assert reads == dataset["reads"]
+    report(benchmark, rss=peak_rss(run), reads=reads, positions=rlen_tot)
+
+
+def test_get_aln_counts(benchmark, dataset, rounds):
+    length = dataset["genome_length"]
+
+    def run():
+        with pysam.AlignmentFile(dataset["bam"], "rb") as alnfile:
+            return get_aln_counts([alnfile, dataset["ref_name"], None, None, length, 5])
+
+    counts = benchmark.pedantic(run, rounds=rounds, iterations=1)
+    assert counts.sum() > 0
+    report(benchmark, rss=peak_rss(run), reads=dataset["reads"], positions=int(counts.sum()))
@@ -0,0 +1,85 @@
+import gzip
+from itertools import islice
+
+import pysam
+
+from helpers import load_script, peak_rss, report, run_script
+from smallgenomeutilities.__mapper_impl__ import find_interval_on_dest
+
+paired_end_read_merger = load_script("paired_end_read_merger")
+extract_coverage_intervals = load_script("extract_coverage_intervals")
+predict_num_reads = load_script("predict_num_reads")
+
+
+def test_find_interval_on_dest(benchmark, dataset, rounds):
+    source, dest = dataset["contigs"][0], dataset["contigs"][1]
+    loci = f"0-{dataset['genome_length'] // 2}"
+
+    def run():
+        return find_interval_on_dest(source, dest, loci, 0, dataset["msa"], False)
+
+    intervals = benchmark.pedantic(run, rounds=rounds, iterations=1)
+    assert len(intervals) > 0
+    report(
+        benchmark,
+        rss=peak_rss(run),
+        positions=dataset["msa_columns"] * len(dataset["contigs"]),
+    )
+
+
+def test_read_fusion(benchmark, dataset, rounds):
+    with pysam.AlignmentFile(dataset["namesorted_sam"], "r") as samfile:
+        header = samfile.header
+        reads = list(samfile.fetch(until_eof=True))
+    pairs = list(zip(reads[0::2], reads[1::2]))
+
+    read_fusion = paired_end_read_merger.read_fusion
+
+    def run():
+        return [read_fusion(r1, r2, header) for r1, r2 in pairs]
+
+    fused = benchmark.pedantic(run, rounds=rounds, iterations=1)
+    assert len(fused) == dataset["pairs"]
+    report(benchmark, rss=peak_rss(run), pairs=len(pairs), reads=len(reads))
+
+
+def test_convert_reference(benchmark, dataset, rounds, tmp_path):
+    args = [
+        "convert_reference",
+        "-t", dataset["contigs"][1],
+        "-m", dataset["msa"],
+        "-i", dataset["bam"],
+        "-o", tmp_path / "converted.bam",
+    ]
+
+    rss = benchmark.pedantic(run_script, args=(args,), rounds=rounds, iterations=1)
+    report(benchmark, rss=rss, reads=dataset["reads"])
+
+
+def test_get_intervals(benchmark, dataset, rounds):
+    length = dataset["genome_length"]
+    # coverage threshold reachable at every scale, windows shorter than the reads
+    args = (dataset["bam"], dataset["depth"] // 2, 0.85, 0, None, 90, 30, dataset["ref_name"], False, False)
+
+    def run():
+        return extract_coverage_intervals.get_intervals(args)
+
+    intervals = benchmark.pedantic(run, rounds=rounds, iterations=1)
+    assert intervals
+    report(benchmark, rss=peak_rss(run), positions=length, reads=dataset["reads"])
+
+
+def test_trim(benchmark, dataset, rounds):
+    quals = []
+    for fastq in dataset["fastq"]:
+        with gzip.open(fastq, "r") as f:
+            # quality strings are every 4th line, starting from the 4th
+            quals += [line.rstrip() for line in islice(f, 3, None, 4)]
+    trim = predict_num_reads.trim
+
+    def run():
+        return [trim(qual, len(qual), 10, 30 + 33) for qual in quals]
+
+    lengths = benchmark.pedantic(run, rounds=rounds, iterations=1)
+    assert len(lengths) == dataset["reads"]
+    report(benchmark, rss=peak_rss(run), reads=len(quals), positions=sum(len(q) for q in quals))
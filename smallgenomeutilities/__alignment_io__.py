@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+import os
+
+import pysam
+
+
+def add_io_arguments(parser):
+    """ Add the `--io-threads`, `--cram-reference` and `--ref-cache` options to an argparse parser """
+    group = parser.add_argument_group('alignment I/O')
+    group.add_argument('--io-threads', metavar='INT', required=False,
+                       default=1,
+                       type=int, dest='io_threads', help='number of threads used by htslib to decompress/compress BAM and decode/encode CRAM files, concurrently with the processing (1: no extra thread)')
+    group.add_argument('--cram-reference', metavar='FASTA', required=False,
+                       default=None,
+                       type=str, dest='cram_reference', help='reference sequence used to decode/encode CRAM files (default: the one given in the CRAM header, looked up through REF_PATH and REF_CACHE)')
+    group.add_argument('--ref-cache', metavar='DIR', required=False,
+                       default=None,
+                       type=str, dest='ref_cache', help='directory where htslib caches the reference sequences needed to decode CRAM files (sets REF_CACHE)')
+    return group
+
+
+def is_cram(path):
+    return isinstance(path, (str, os.PathLike)) and os.path.splitext(os.fspath(path))[1] == '.cram'
+
+
+class AlignmentIO():
+    """
+    Open SAM/BAM/CRAM files with a common configuration:
+     - threads: number of htslib threads which (de)compress BGZF blocks and
+       (de)code CRAM slices while Python processes the reads
+     - reference: FASTA used to decode/encode CRAM files
+     - ref_cache: directory caching the references of CRAM files (REF_CACHE)
+
+    The configuration is picklable and can be passed along to the workers
+    of a multiprocessing Pool.
+    """
+
+    def __init__(self, threads=1, reference=None, ref_cache=None):
+        self.threads = max(1, threads)
+        self.reference = reference
+        self.ref_cache = ref_cache
+        if ref_cache:
+            # NOTE htslib reads it from the environment, which is also inherited by the workers.
+            # It is set for the rest of the process: sgu restores the environment after each run
+            os.environ['REF_CACHE'] = ref_cache if '%s' in ref_cache else os.path.join(ref_cache, '%2s', '%2s', '%s')
+
+    @classmethod
+    def from_args(cls, args):
+        """ Build from the options added by add_io_arguments() """
+        return cls(threads=args.io_threads, reference=args.cram_reference, ref_cache=args.ref_cache)
+
+    def open(self, path, mode=None, **kwargs):
+        """
+        Open an alignment file (or file object) for reading. Unless a mode
+        is given, CRAM is detected from the extension; SAM and BAM are
+        detected by htslib from the content.
+        """
+        if mode is None:
+            mode = 'rc' if is_cram(path) else 'rb'
+        return pysam.AlignmentFile(path, mode, threads=self.threads,
+                                   reference_filename=self.reference, **kwargs)
+
+    def write(self, path, mode=None, temporary=False, **kwargs):
+        """
+        Open an alignment file (or file object) for writing, e.g. with
+        `header=` or `template=`. Unless a mode is given, the format is
+        given by the extension: .bam, .cram, and SAM otherwise.
+        Temporary files (e.g.: read back right away to be sorted) are
+        written as uncompressed BAM.
+        """
+        if mode is None:
+            if temporary:
+                mode = 'wbu'
+            elif is_cram(path):
+                mode = 'wc'
+            elif isinstance(path, (str, os.PathLike)) and os.path.splitext(os.fspath(path))[1] == '.bam':
+                mode = 'wb'
+            else:
+                mode = 'w'
+        return pysam.AlignmentFile(path, mode, threads=self.threads,
+                                   reference_filename=self.reference, **kwargs)
+
+    def threads_options(self):
+        # NOTE as with pysam, a single thread means no extra thread
+        return ['-@', str(self.threads)] if self.threads > 1 else []
+
+    def sort(self, output, path, *args):
+        """ Sort an alignment file into output, with the samtools bundled in pysam """
+        opts = self.threads_options()
+        if self.reference:
+            opts += ['--reference', self.reference]
+        pysam.sort(*opts, *args, '-o', os.fspath(output), os.fspath(path))
+
+    def index(self, path):
+        """ Index an alignment file, with the samtools bundled in pysam """
+        pysam.index(*self.threads_options(), os.fspath(path))
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import hashlib
+import tempfile
+
+import numpy as np
+
+
+DEFAULT_MAX_SIZE = 1024
+'''default size bound of the cache, in MiB'''
+
+FORMAT_VERSION = 2
+'''bump whenever the counting code changes what ends up in the matrices'''
+
+
+def add_cache_arguments(parser):
+    """ Add the `--cache-dir` and `--cache-size` options to an argparse parser """
+    group = parser.add_argument_group('count cache')
+    group.add_argument('--cache-dir', metavar='DIR', required=False,
+                       default=None,
+                       type=str, dest='cache_dir', help='reuse the per-position base counts of alignment files across runs (and across aln2basecnt, minority_freq and extract_consensus) by storing them in this directory')
+    group.add_argument('--cache-size', metavar='MiB', required=False,
+                       default=DEFAULT_MAX_SIZE,
+                       type=int, dest='cache_size', help='evict the least recently used count matrices once the cache grows beyond this size')
+    return group
+
+
+def find_index(alnfile):
+    """ Return the path of the index of a BAM/CRAM file, looking where pysam does """
+    stem = os.path.splitext(alnfile)[0]
+    for index in (f'{alnfile}.bai', f'{alnfile}.csi', f'{alnfile}.crai',
+                  f'{stem}.bai', f'{stem}.csi', f'{stem}.crai'):
+        if os.path.isfile(index):
+            return index
+    return None
+
+
+def file_checksum(path, blocksize=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(blocksize), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def aligned_counts_params(reference_name, start, stop, alphabet):
+    """
+    Parameters identifying the matrices counted by get_cnt_matrix() and
+    get_counts(): bases of the alphabet (including deletions '-') of every
+    fetched read, over the half-open interval [start, stop)
+    """
+    return {'method': 'aligned sequence', 'reference': reference_name,
+            'start': start, 'stop': stop, 'alphabet': alphabet,
+            'read_filter': None, 'quality_threshold': None}
+
+
+def coverage_counts_params(reference_name, start, stop, quality_threshold, read_callback='all'):
+    """
+    Parameters identifying the matrices counted by pysam's count_coverage()
+    over the half-open interval [start, stop)
+    """
+    return {'method': 'count_coverage', 'reference': reference_name,
+            'start': start, 'stop': stop, 'alphabet': 'ACGT',
+            'read_filter': read_callback, 'quality_threshold': quality_threshold}
+
+
+class CountCache():
+    """
+    On-disk cache of per-position base count matrices (positions in rows,
+    alphabet in columns), stored as uint32 .npy files and loaded
+    memory-mapped.
+
+    Entries are content-addressed: the key is a checksum of the identity of
+    the alignment file (size and modification time of the file, size,
+    modification time and checksum of its index) and of the parameters
+    which determine the counts (see aligned_counts_params() and
+    coverage_counts_params()). Thresholds applied downstream of the counts
+    (coverage, frequencies, ...) are not part of the key, so changing them
+    only reruns the cheap post-processing.
+
+    Once the cache grows beyond max_size MiB, the least recently used
+    entries are evicted.
+
+    Without a cache directory, nothing is stored and every lookup misses.
+    """
+
+    def __init__(self, cache_dir=None, max_size=DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size * 1024 * 1024
+        self.enabled = cache_dir is not None
+        self._identities = {}
+        if self.enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_args(cls, args):
+        """ Build from the options added by add_cache_arguments() """
+        return cls(cache_dir=args.cache_dir, max_size=args.cache_size)
+
+    def identity(self, alnfile):
+        """ Return what identifies the content of an alignment file, None if it has no index """
+        index = find_index(alnfile)
+        if index is None:
+            return None
+        aln_st = os.stat(alnfile)
+        idx_st = os.stat(index)
+        ident = (aln_st.st_size, aln_st.st_mtime_ns, idx_st.st_size, idx_st.st_mtime_ns)
+        # NOTE the index is small, but still only checksum it once per run
+        memo = self._identities.get(index)
+        if memo is None or memo[0] != ident:
+            memo = (ident, file_checksum(index))
+            self._identities[index] = memo
+        return {'size': aln_st.st_size, 'mtime_ns': aln_st.st_mtime_ns,
+                'index_size': idx_st.st_size, 'index_mtime_ns': idx_st.st_mtime_ns,
+                'index_sha256': memo[1]}
+
+    def key(self, alnfile, params):
+        """ Return the key of the counts of alnfile computed with params, None if they can't be cached """
+        if not self.enabled:
+            return None
+        ident = self.identity(alnfile)
+        if ident is None:
+            return None
+        desc = json.dumps({'version': FORMAT_VERSION, 'alignment': ident, 'params': params}, sort_keys=True)
+        return hashlib.sha256(desc.encode()).hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return (f'{base}.npy', f'{base}.json')
+
+    def get(self, key, dtype=None):
+        """
+        Return (counts, meta) of a cached entry, or None on a miss. The
+        counts are a read-only memory-mapped uint32 matrix, unless a dtype
+        is given: then they are loaded as an array of that dtype (e.g. the
+        one returned by the counting function on a miss).
+        """
+        if key is None:
+            return None
+        npy, js = self._paths(key)
+        try:
+            counts = np.load(npy, mmap_mode='r')
+            with open(js, 'rt') as jf:
+                meta = json.load(jf)['meta']
+            if dtype is not None:
+                counts = counts.astype(dtype)
+        except (OSError, ValueError, KeyError):
+            # missing, or evicted/being replaced concurrently
+            return None
+        # mark as recently used
+        try:
+            os.utime(npy)
+        except OSError:
+            pass
+        return counts, meta
+
+    def put(self, key, counts, params=None, meta=None):
+        """
+        Store a count matrix (and optional extra values, e.g. read counts)
+        under key, then evict the least recently used entries beyond the
+        size bound. Return the counts.
+        """
+        if key is None:
+            return counts
+        npy, js = self._paths(key)
+
+        # the description is written first: the matrix only appears once complete
+        with open(js, 'wt') as jf:
+            json.dump({'params': params, 'meta': meta if meta else {}}, jf, indent=2)
+
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            mm = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.uint32, shape=np.shape(counts))
+            mm[...] = counts
+            mm.flush()
+            del mm
+            os.replace(tmp, npy)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+        self.evict(keep=key)
+        return counts
+
+    def entries(self):
+        """ Return (last use, size, key) of all cached entries, least recently used first """
+        res = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.npy'):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            res.append((st.st_mtime_ns, st.st_size, entry.name[:-len('.npy')]))
+        return sorted(res)
+
+    def evict(self, keep=None):
+        """ Remove the least recently used entries until the cache fits in max_size """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
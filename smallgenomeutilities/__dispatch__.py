@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import shlex
+import runpy
+import argparse
+import traceback
+
+from smallgenomeutilities._version import __version__
+
+
+# NOTE keep in sync with `script-files` in pyproject.toml
+SUBCOMMANDS = (
+    "aln2basecnt",
+    "compute_mds",
+    "convert_qr",
+    "convert_reference",
+    "coverage",
+    "coverage_stats",
+    "coverage_depth_qc",
+    "extract_consensus",
+    "extract_coverage_intervals",
+    "extract_sam",
+    "extract_seq",
+    "frameshift_deletions_checks",
+    "gather_coverage",
+    "mapper",
+    "min_coverage",
+    "minority_freq",
+    "pair_sequences",
+    "paired_end_read_merger",
+    "predict_num_reads",
+    "prepare_primers",
+    "remove_gaps_msa",
+)
+
+
+def find_subcommand(name, script_dir):
+    """
+    Return the path of the script implementing the subcommand, looking
+    first next to the dispatcher, then in the PATH
+    """
+    if name not in SUBCOMMANDS:
+        return None
+    path = os.path.join(script_dir, name)
+    if os.path.isfile(path):
+        return path
+    from shutil import which
+
+    return which(name)
+
+
+def exit_status(code):
+    """Convert a SystemExit code into a process exit status, as the interpreter would"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_subcommand(name, argv, script_dir):
+    """
+    Run one subcommand inside the current interpreter, as if it was called
+    from the command line with the arguments argv. Return its exit status.
+
+    Each run starts from a fresh `__main__` namespace and from the
+    environment variables of the caller (e.g. `--ref-cache` sets REF_CACHE),
+    but the modules imported by a previous run (numpy, pysam, pandas,
+    Biopython, ...) are reused, which is where the savings come from.
+    """
+    path = find_subcommand(name, script_dir)
+    if path is None:
+        print(f"sgu: unknown subcommand '{name}'", file=sys.stderr)
+        return 2
+
+    saved_argv = sys.argv
+    saved_environ = dict(os.environ)
+    sys.argv = [path] + list(argv)
+    try:
+        runpy.run_path(path, run_name="__main__")
+        status = 0
+    except SystemExit as e:
+        status = exit_status(e.code)
+    except Exception:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.argv = saved_argv
+        # NOTE os.environ updates the process environment, which htslib reads
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return status
+
+
+def parse_manifest(manifest):
+    """
+    Yield (line number, argument list) of each invocation in the manifest:
+    one command line per line, with shell-like quoting. Empty lines and
+    comments starting with '#' are skipped
+    """
+    mf = sys.stdin if manifest == "-" else open(manifest, "rt")
+    try:
+        for num, line in enumerate(mf, start=1):
+            argv = shlex.split(line, comments=True)
+            if argv:
+                yield (num, argv)
+    finally:
+        if mf is not sys.stdin:
+            mf.close()
+
+
+def run_manifest(manifest, script_dir, keep_going=False):
+    """
+    Run all the invocations listed in the manifest in the current
+    interpreter. Stop at the first failure unless keep_going is set.
+    Return 0 if all succeeded, 1 otherwise.
+    """
+    failed = 0
+    for num, argv in parse_manifest(manifest):
+        status = run_subcommand(argv[0], argv[1:], script_dir)
+        if status:
+            failed += 1
+            print(f"sgu: {manifest}:{num}: '{argv[0]}' failed with exit status {status}", file=sys.stderr)
+            if not keep_going:
+                break
+    return 1 if failed else 0
+
+
+def parse_args(argv=None):
+    """ Set up the parsing of command-line arguments """
+    parser = argparse.ArgumentParser(
+        prog="sgu",
+        description="Run smallgenomeutilities subcommands, either one from the command line or many from a manifest, inside a single interpreter",
+        epilog="manifest: one subcommand invocation per line (e.g.: 'extract_consensus -i sample.bam -o outdir'), with shell-like quoting and '#' comments",
+    )
+    parser.add_argument("-m", "--manifest", metavar="FILE", required=False,
+                        default=None,
+                        type=str, dest="manifest", help="run all the invocations listed in FILE ('-' for stdin)")
+    parser.add_argument("-k", "--keep-going", required=False,
+                        default=False, action="store_true",
+                        dest="keep_going", help="with --manifest, keep running after an invocation fails")
+    parser.add_argument("-l", "--list", required=False,
+                        default=False, action="store_true",
+                        dest="list", help="list the available subcommands")
+    parser.add_argument("-v", "--version", action="version", version=__version__)
+    parser.add_argument("SUBCOMMAND", nargs="?", metavar="SUBCOMMAND", help="utility to run")
+    parser.add_argument("ARGS", nargs=argparse.REMAINDER, metavar="ARGS", help="arguments of the utility")
+
+    args = parser.parse_args(argv)
+    if args.list:
+        return args
+    if (args.manifest is None) == (args.SUBCOMMAND is None):
+        parser.error("either a SUBCOMMAND or a --manifest is required (but not both)")
+    return args
+
+
+def main(argv=None, script_dir=None):
+    args = parse_args(argv)
+    if script_dir is None:
+        # the utilities are installed alongside the dispatcher
+        script_dir = os.path.dirname(os.path.abspath(sys.argv[0]))
+
+    if args.list:
+        print("\n".join(SUBCOMMANDS))
+        return 0
+    if args.manifest is not None:
+        return run_manifest(args.manifest, script_dir, keep_going=args.keep_going)
+    return run_subcommand(args.SUBCOMMAND, args.ARGS, script_dir)
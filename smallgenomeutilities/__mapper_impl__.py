@@ -3,7 +3,6 @@
 from collections import namedtuple
 
 import sys
-import Bio.SeqIO
 
 gRange = namedtuple("gRange", "start stop")
 
@@ -66,6 +65,9 @@ def find_interval_on_dest(source, dest, list_loci, offset, msa_file, verbose):
         convert_from_intervals_to_list(split_loci))
 
     # Load genomes from MSA FASTA file
+    # NOTE Biopython is slow to import, only load it when needed
+    import Bio.SeqIO
+
     genomes = {}
     for record in Bio.SeqIO.parse(msa_file, "fasta"):
         record.id = record.id.split('_', 1)[0]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import time
+import resource
+
+
+def peak_rss(who=resource.RUSAGE_SELF):
+    """Return the peak resident set size (in MiB) reached so far"""
+    rss = resource.getrusage(who).ru_maxrss
+    # NOTE Linux reports KiB, macOS reports bytes
+    return rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def add_metrics_arguments(parser):
+    """ Add the `--metrics` and `--profile` options to an argparse parser """
+    group = parser.add_argument_group('instrumentation')
+    group.add_argument('--metrics', metavar='JSON', required=False,
+                       default=None,
+                       type=str, dest='metrics', help='write per-stage wall time, CPU time and peak RSS, as well as item counters, to this JSON file')
+    group.add_argument('--profile', metavar='PSTATS', required=False,
+                       default=None,
+                       type=str, dest='profile', help='profile the run with cProfile and dump the statistics to this file (read them with `python -m pstats`)')
+    return group
+
+
+class Metrics():
+    """
+    Collect wall time, CPU time and peak RSS of the named stages of a run
+    (e.g.: 'load reference', 'fetch', 'count', 'post-process', 'write')
+    and counters of processed items (e.g.: 'reads', 'pairs', 'positions').
+
+    Stages are sequential: starting a stage ends the current one. They can
+    either be marked:
+        metrics.stage('fetch')
+        ...
+        metrics.stage('count')
+    or used as context managers:
+        with metrics.stage('write'):
+            ...
+    A stage entered several times (e.g.: once per reference) accumulates.
+
+    Without a metrics file, nothing is measured and stages cost nothing.
+    """
+
+    def __init__(self, metrics_file=None, profile_file=None, name=None):
+        self.metrics_file = metrics_file
+        self.profile_file = profile_file
+        self.name = name if name else os.path.basename(sys.argv[0])
+        self.enabled = metrics_file is not None
+        self.stages = {}
+        self.counters = {}
+        self._current = None
+        self._start = self._snapshot() if self.enabled else None
+
+        self._profiler = None
+        if profile_file:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @classmethod
+    def from_args(cls, args, name=None):
+        """ Build from the options added by add_metrics_arguments() """
+        return cls(metrics_file=args.metrics, profile_file=args.profile, name=name)
+
+    @staticmethod
+    def _snapshot():
+        t = os.times()
+        # NOTE children only count once they have been waited for (e.g.: a terminated Pool)
+        return (time.perf_counter(), time.process_time(), t.children_user + t.children_system)
+
+    def stage(self, name):
+        self.end_stage()
+        if self.enabled:
+            self._current = (name, self._snapshot())
+        return self
+
+    def end_stage(self):
+        if self._current is None:
+            return
+        name, (wall0, cpu0, ccpu0) = self._current
+        wall, cpu, ccpu = self._snapshot()
+        self._current = None
+
+        st = self.stages.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'children_cpu_s': 0.0, 'peak_rss_MiB': 0.0})
+        st['calls'] += 1
+        st['wall_s'] += wall - wall0
+        st['cpu_s'] += cpu - cpu0
+        st['children_cpu_s'] += ccpu - ccpu0
+        st['peak_rss_MiB'] = max(st['peak_rss_MiB'], peak_rss())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_stage()
+        return False
+
+    def count(self, counter, n=1):
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def summary(self):
+        """ Return the metrics collected so far as a dict """
+        wall, cpu, ccpu = self._snapshot()
+        wall0, cpu0, ccpu0 = self._start
+        total = wall - wall0
+        return {
+            'script': self.name,
+            'argv': sys.argv[1:],
+            'wall_s': total,
+            'cpu_s': cpu - cpu0,
+            'children_cpu_s': ccpu - ccpu0,
+            'peak_rss_MiB': peak_rss(),
+            'children_peak_rss_MiB': peak_rss(resource.RUSAGE_CHILDREN),
+            'stages': self.stages,
+            'counters': self.counters,
+            # throughput of the whole run
+            'rates': {f'{k}/s': (v / total if total else 0.0) for k, v in self.counters.items()},
+        }
+
+    def finish(self):
+        """ End the current stage, then write the metrics and the profile """
+        self.end_stage()
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(self.profile_file)
+            self._profiler = None
+        if self.enabled:
+            with open(self.metrics_file, 'wt') as mf:
+                json.dump(self.summary(), mf, indent=2)
+            self.enabled = False
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 
-import os
-import pysam
 import numpy as np
 
+from smallgenomeutilities.__alignment_io__ import AlignmentIO
+
 
 class AlignedRead():
 
@@ -115,10 +115,12 @@ def get_aln_counts(args):
 def get_counts(args):
 
     bamfile = args[0]
+    # optionally followed by the AlignmentIO configuration
+    aln_io = args[6] if len(args) > 6 else AlignmentIO()
 
-    with pysam.AlignmentFile(bamfile, 'rc' if os.path.splitext(bamfile)[1] == '.cram' else 'rb') as alnfile:
+    with aln_io.open(bamfile) as alnfile:
 
-        return get_aln_counts([alnfile] + list(args[1:]))
+        return get_aln_counts([alnfile] + list(args[1:6]))
 
 
 def get_cnt_matrix (alnfile, reference_name, alpha='ACGT-'):
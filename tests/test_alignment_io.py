@@ -0,0 +1,86 @@
+import subprocess
+from pathlib import PurePath
+import shutil
+import pysam
+
+from smallgenomeutilities.__alignment_io__ import AlignmentIO
+
+
+def test_write_sort(tmp_path):
+    aln_io = AlignmentIO(threads=3)
+
+    with aln_io.open(PurePath("tests/mini_sam/mini.sam")) as samfile:
+        header = samfile.header
+        reads = list(samfile.fetch(until_eof=True))
+
+    # temporary files are uncompressed BAM
+    temp = tmp_path / "temp.bam"
+    with aln_io.write(temp, temporary=True, header=header) as outfile:
+        for read in reads:
+            outfile.write(read)
+    with open(temp, "rb") as f:
+        # BGZF block holding the raw 'BAM\1' magic
+        assert f.read(2) == b"\x1f\x8b"
+        assert b"BAM\x01" in f.read(64)
+
+    out = tmp_path / "sorted.bam"
+    aln_io.sort(out, temp)
+    aln_io.index(out)
+
+    with aln_io.open(out) as alnfile:
+        assert alnfile.is_bam
+        assert alnfile.has_index()
+        positions = [r.reference_start for r in alnfile.fetch()]
+    assert len(positions) == len(reads)
+    assert positions == sorted(positions)
+
+
+def test_script_cram(tmp_path):
+    datapath = PurePath("tests/test_aln2basecnt")
+    reference = tmp_path / "NC_045512.2.fasta"
+    shutil.copy(PurePath("tests/test_frameshift_deletions_checks/NC_045512.2.fasta"), reference)
+
+    # NOTE use the samtools bundled with pysam
+    bam = tmp_path / "mini.bam"
+    cram = tmp_path / "mini.cram"
+    pysam.sort("-o", str(bam), str(PurePath("tests/mini_sam/mini.sam")))
+    pysam.view("-C", "-T", str(reference), "-o", str(cram), str(bam), catch_stdout=False)
+    pysam.index(str(cram))
+
+    subprocess.check_call(
+        [
+            "aln2basecnt",
+            "--name=mini",
+            "--first=1",
+            f"--basecnt={tmp_path / 'mini.basecnt.tsv'}",
+            f"--coverage={tmp_path / 'mini.coverage.tsv'}",
+            f"--cram-reference={reference}",
+            "--io-threads=4",
+            cram,
+        ]
+    )
+
+    # check output
+    for f in ("mini.basecnt.tsv", "mini.coverage.tsv"):
+        with open(datapath / f, "rt") as expf, open(tmp_path / f, "rt") as outf:
+            assert [r for r in expf] == [row for row in outf]
+
+
+def test_script_threads(tmp_path):
+    datapath = PurePath("tests/test_paired_end_read_merger")
+
+    exp = datapath / "mini_merged.sam"  # expected
+    out = tmp_path / "mini_merged.sam"  # current
+
+    subprocess.check_call(
+        [
+            "paired_end_read_merger",
+            f"--output={out}",
+            "--io-threads=4",
+            datapath / "mini.sam",
+        ]
+    )
+
+    # output isn't affected by the threads
+    with open(exp, "rt") as expf, open(out, "rt") as outf:
+        assert [r for r in expf] == [row for row in outf]
@@ -0,0 +1,72 @@
+import importlib.machinery
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def load_script(name):
+    loader = importlib.machinery.SourceFileLoader(name, str(Path(__file__).parent.joinpath("..", "scripts", name)))
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    # NOTE the worker processes look the functions up by module name
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+compute_mds = load_script("compute_mds")
+
+
+def random_haplotypes(rng, num_haps, length):
+    """Return haplotypes with uncovered ends ('*') and deletions, and their insertions"""
+    haps = []
+    insertions = []
+    insertion_len = []
+    for _ in range(num_haps):
+        seq = [rng.choice("ACGT-") for _ in range(length)]
+        start = rng.randrange(0, 5)
+        end = length - rng.randrange(0, 5)
+        haps.append("*" * start + "".join(seq[start:end]) + "*" * (length - end))
+
+        ins = []
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            # few positions, so that insertions overlap
+            ins.append([rng.choice([10, 20, 30]), "".join(rng.choice("ACGT") for _ in range(rng.randrange(1, 5)))])
+        insertions.append(ins)
+        insertion_len.append(sum(len(i[1]) for i in ins))
+    return haps, insertions, insertion_len
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+@pytest.mark.parametrize("block_cells", [1, 7, 1 << 24])
+def test_pairwise_hamming(threads, block_cells):
+    rng = random.Random(threads * block_cells)
+    haps, insertions, insertion_len = random_haplotypes(rng, 9, 40)
+    others = [h.replace("*", "A") for h in random_haplotypes(rng, 4, 40)[0]]
+
+    # symmetric case, with the insertions as the per-pair comparison accounted for them
+    dist, alignment_len = compute_mds.pairwise_hamming(haps, threads=threads, block_cells=block_cells)
+    compute_mds.add_insertions(dist, alignment_len, insertions, insertion_len)
+    for i in range(len(haps)):
+        for j in range(len(haps)):
+            exp = compute_mds.hamming_dist(haps[i], haps[j])
+            exp_dist, exp_len = exp[0], exp[1]
+            if insertion_len[i] > 0 or insertion_len[j] > 0:
+                if insertion_len[i] > 0 and insertion_len[j] > 0:
+                    aux = compute_mds.compare_insertions(insertions[i], insertions[j], insertion_len[i], insertion_len[j])
+                    exp_dist += aux[0]
+                    exp_len += aux[1]
+                else:
+                    exp_dist += insertion_len[i] + insertion_len[j]
+                    exp_len += insertion_len[i] + insertion_len[j]
+            assert (dist[i, j], alignment_len[i, j]) == (exp_dist, exp_len)
+
+    # set A vs set B
+    dist, alignment_len = compute_mds.pairwise_hamming(haps, others, threads=threads, block_cells=block_cells)
+    assert dist.shape == (len(haps), len(others))
+    for i in range(len(haps)):
+        for j in range(len(others)):
+            assert (dist[i, j], alignment_len[i, j]) == compute_mds.hamming_dist(haps[i], others[j])
@@ -0,0 +1,159 @@
+import subprocess
+from pathlib import PurePath
+import json
+import time
+import shutil
+import numpy as np
+import pysam
+
+from smallgenomeutilities.__count_cache__ import CountCache, aligned_counts_params
+
+
+def make_bam(tmp_path, name):
+    # NOTE use the samtools bundled with pysam
+    bam = tmp_path / f"{name}.bam"
+    pysam.sort("-o", str(bam), str(PurePath("tests/mini_sam") / f"{name}.sam"))
+    pysam.index(str(bam))
+    return bam
+
+
+def test_cache(tmp_path):
+    bam = make_bam(tmp_path, "mini")
+    cache = CountCache(cache_dir=tmp_path / "cache")
+
+    params = aligned_counts_params("NC_045512.2", 0, 100, "ACGT-")
+    key = cache.key(bam, params)
+    assert cache.get(key) is None
+
+    counts = np.arange(500).reshape((100, 5))
+    cache.put(key, counts, params, {"reads": 3})
+    cached, meta = cache.get(key)
+    assert cached.dtype == np.uint32
+    assert (cached == counts).all()
+    assert meta == {"reads": 3}
+
+    # loaded as the counting function returns them
+    cached, _ = cache.get(key, dtype=np.float64)
+    assert cached.dtype == np.float64
+    assert cached.flags.writeable
+    assert (cached == counts).all()
+
+    # any parameter changes the key
+    assert cache.key(bam, aligned_counts_params("NC_045512.2", 0, 100, "ACGT")) != key
+    assert cache.key(bam, aligned_counts_params("NC_045512.2", 1, 100, "ACGT-")) != key
+
+    # so does re-indexing the alignment
+    pysam.index("-c", str(bam))
+    (tmp_path / "mini.bam.bai").unlink()
+    assert cache.key(bam, params) != key
+
+    # disabled cache
+    assert CountCache().key(bam, params) is None
+
+
+def test_eviction(tmp_path):
+    bam = make_bam(tmp_path, "mini")
+    cache = CountCache(cache_dir=tmp_path / "cache", max_size=1)
+
+    # each matrix takes about 400 KiB: only two fit in 1 MiB
+    keys = []
+    for start in range(4):
+        if start >= 2:
+            # keep using the first entry
+            assert cache.get(keys[0]) is not None
+        params = aligned_counts_params("NC_045512.2", start, start + 20000, "ACGT-")
+        keys.append(cache.key(bam, params))
+        cache.put(keys[-1], np.ones((20000, 5)), params)
+        # NOTE leave the file timestamps time to differ
+        time.sleep(0.05)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[3]) is not None
+
+
+def test_script_cache(tmp_path):
+    bam = make_bam(tmp_path, "mini")
+    datapath = PurePath("tests/test_aln2basecnt")
+    cache = tmp_path / "cache"
+
+    for run in ("miss", "hit"):
+        metrics = tmp_path / f"{run}.json"
+        subprocess.check_call(
+            [
+                "aln2basecnt",
+                "--name=mini",
+                "--first=1",
+                f"--basecnt={tmp_path / 'mini.basecnt.tsv'}",
+                f"--coverage={tmp_path / 'mini.coverage.tsv'}",
+                f"--cache-dir={cache}",
+                f"--metrics={metrics}",
+                bam,
+            ]
+        )
+
+        # output isn't affected
+        for f in ("mini.basecnt.tsv", "mini.coverage.tsv"):
+            with open(datapath / f, "rt") as expf, open(tmp_path / f, "rt") as outf:
+                assert [r for r in expf] == [row for row in outf]
+
+        with open(metrics, "rt") as mf:
+            res = json.load(mf)
+        assert res["counters"].get("cached", 0) == (1 if run == "hit" else 0)
+
+    # the counts are shared with minority_freq
+    reference = tmp_path / "NC_045512.2.fasta"
+    shutil.copy(PurePath("tests/test_frameshift_deletions_checks/NC_045512.2.fasta"), reference)
+    metrics = tmp_path / "minority_freq.json"
+    subprocess.check_call(
+        [
+            "minority_freq",
+            "-r",
+            reference,
+            "-o",
+            tmp_path,
+            f"--cache-dir={cache}",
+            f"--metrics={metrics}",
+            bam,
+        ]
+    )
+    with open(metrics, "rt") as mf:
+        assert json.load(mf)["counters"]["cached"] == 1
+
+
+def compare_outputs(exp_dir, out_dir):
+    for exp in sorted(exp_dir.iterdir()):
+        if exp.suffix == ".npy":
+            assert (np.load(exp) == np.load(out_dir / exp.name)).all()
+        else:
+            with open(exp, "rt") as expf, open(out_dir / exp.name, "rt") as outf:
+                assert [r for r in expf] == [row for row in outf]
+
+
+def test_script_hit_miss(tmp_path):
+    bams = [make_bam(tmp_path, "mini"), make_bam(tmp_path, "mini_merged")]
+    reference = tmp_path / "NC_045512.2.fasta"
+    shutil.copy(PurePath("tests/test_frameshift_deletions_checks/NC_045512.2.fasta"), reference)
+    cache = tmp_path / "cache"
+
+    def run(cmd, name, cached=False):
+        outdir = tmp_path / name
+        outdir.mkdir()
+        subprocess.check_call(cmd + ["-o", outdir] + ([f"--cache-dir={cache}"] if cached else []))
+        return outdir
+
+    # minority_freq over a region: ends up with the same positions as extract_consensus below,
+    # but also counts the end position
+    minority_freq = ["minority_freq", "-r", "NC_045512.2", "-s", "300", "-e", "901", "-c", "1", "-f", "-d"]
+    exp = run(minority_freq + bams, "minority_freq")
+    # only cache the first sample: the next run mixes a hit with a miss
+    run(minority_freq + bams[:1], "minority_freq_first", cached=True)
+    for run_name in ("minority_freq_miss1", "minority_freq_hit"):
+        compare_outputs(exp, run(minority_freq + bams, run_name, cached=True))
+
+    for region in ([], ["-r", "NC_045512.2:300-900"]):
+        extract_consensus = ["extract_consensus", "-i", bams[0], "-c", "1", "-a", "0.2"] + region
+        exp = run(extract_consensus, f"extract_consensus{len(region)}")
+        for run_name in ("miss", "hit"):
+            compare_outputs(exp, run(extract_consensus, f"extract_consensus{len(region)}_{run_name}", cached=True))
@@ -0,0 +1,126 @@
+import subprocess
+import random
+import pytest
+import pysam
+
+from smallgenomeutilities.__mapper_impl__ import convert_from_intervals_to_list, find_interval_on_dest
+
+
+def make_read(header, name, flag, start, seq, cigar, mate_start=None, mate_tlen=0):
+    read = pysam.AlignedSegment(header)
+    read.query_name = name
+    read.flag = flag
+    read.reference_id = 0
+    read.reference_start = start
+    read.mapping_quality = 60
+    read.cigarstring = cigar
+    read.query_sequence = seq
+    read.query_qualities = pysam.qualitystring_to_array("I" * len(seq))
+    if mate_start is not None:
+        read.next_reference_id = 0
+        read.next_reference_start = mate_start
+        read.template_length = mate_tlen
+    return read
+
+
+def random_read(rng, genome, length):
+    """Return (start, sequence, CIGAR) of a read with mutations and maybe a deletion"""
+    start = rng.randrange(0, len(genome) - length - 5)
+    seq = [b if rng.random() > 0.05 else rng.choice("ACGT") for b in genome[start:start + length]]
+    if rng.random() < 0.3:
+        # deletion in the middle of the read
+        pos = rng.randrange(10, length - 10)
+        dlen = rng.randrange(1, 4)
+        seq = seq[:pos] + [b if rng.random() > 0.05 else rng.choice("ACGT") for b in genome[start + pos + dlen:start + length + dlen]][:length - pos]
+        return start, "".join(seq), f"{pos}M{dlen}D{length - pos}M"
+    return start, "".join(seq), f"{length}M"
+
+
+def make_bam(tmp_path, seed, fmt="bam"):
+    rng = random.Random(seed)
+    genome = "".join(rng.choice("ACGT") for _ in range(400))
+    header = pysam.AlignmentHeader.from_dict({"HD": {"VN": "1.6"}, "SQ": [{"SN": "ref", "LN": len(genome)}]})
+
+    reads = []
+    for i in range(300):
+        name = f"pair{i}"
+        s1, seq1, cig1 = random_read(rng, genome, 60)
+        s2, seq2, cig2 = random_read(rng, genome, 60)
+        s1, seq1, cig1, s2, seq2, cig2 = (s1, seq1, cig1, s2, seq2, cig2) if s1 <= s2 else (s2, seq2, cig2, s1, seq1, cig1)
+        kind = rng.random()
+        if kind < 0.1:
+            # unpaired read
+            reads.append(make_read(header, name, 0, s1, seq1, cig1))
+            continue
+        reads.append(make_read(header, name, 99, s1, seq1, cig1, s2, s2 + 60 - s1))
+        reads.append(make_read(header, name, 147, s2, seq2, cig2, s1, s1 - s2 - 60))
+        # secondary and supplementary records, anywhere
+        if kind > 0.6:
+            s, seq, cig = random_read(rng, genome, 60)
+            reads.append(make_read(header, name, 99 | 2048, s, seq, cig, s2))
+        if kind > 0.8:
+            s, seq, cig = random_read(rng, genome, 60)
+            reads.append(make_read(header, name, 147 | 256, s, seq, cig, s1))
+
+    if fmt == "sam":
+        # neither sorted nor indexed
+        bam = tmp_path / "reads.sam"
+        with pysam.AlignmentFile(bam, "w", header=header) as out:
+            for read in reads:
+                out.write(read)
+    else:
+        unsorted = tmp_path / "unsorted.bam"
+        with pysam.AlignmentFile(unsorted, "wb", header=header) as out:
+            for read in reads:
+                out.write(read)
+        bam = tmp_path / "reads.bam"
+        pysam.sort("-o", str(bam), str(unsorted))
+        pysam.index(str(bam))
+
+    msa = tmp_path / "msa.fasta"
+    with open(msa, "wt") as mf:
+        print(f">ref\n{genome}", file=mf)
+    return bam, msa
+
+
+def whole_file_counts(bam, loci):
+    """Pair the primary records of the whole file by name (as extract_sam did originally)"""
+    reads = {}
+    with pysam.AlignmentFile(bam) as alnfile:
+        for record in alnfile.fetch(until_eof=True):
+            if record.is_unmapped or record.is_secondary or record.is_supplementary:
+                continue
+            reads.setdefault(record.query_name, []).append(record)
+
+    counts = {}
+    for mates in reads.values():
+        for read in sorted(mates, key=lambda r: r.reference_start)[:2]:
+            if read.reference_start <= loci[0] and loci[-1] < read.reference_end:
+                bases = {
+                    ref: (read.query_sequence[qry] if qry is not None else "-")
+                    for qry, ref in read.get_aligned_pairs()
+                    if ref is not None
+                }
+                seq = "".join(bases[pos] for pos in loci)
+                counts[seq] = counts.get(seq, 0) + 1
+                break
+    return counts
+
+
+@pytest.mark.parametrize("fmt", ["bam", "sam"])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("region", ["150-160", "20-45", "300-330"])
+def test_extract_sam_pairing(tmp_path, fmt, seed, region):
+    bam, msa = make_bam(tmp_path, seed, fmt)
+    out = tmp_path / "out.tsv"
+
+    subprocess.check_call(["extract_sam", "-t", f"ref:{region}", "-i", bam, "-o", out, "-T", msa])
+
+    res = {}
+    with open(out, "rt") as outf:
+        for line in outf:
+            _, seq, count = line.rstrip("\n").split("\t")
+            res[seq] = int(count)
+
+    loci = convert_from_intervals_to_list(find_interval_on_dest("ref", "ref", region, 0, msa, False))
+    assert res == whole_file_counts(bam, loci)
@@ -159,3 +159,39 @@ def test_align(combin):
                     a=with_chain_dict[k], b=with_mafft_dict[k]
                 ).get_opcodes()
                 assert expect_diff == observed_diff
+
+
+def test_batch(tmp_path):
+    # data: its handled with LFS
+    datapath = PurePath("tests/test_frameshift_deletions_checks")
+
+    # half of the samples with a chain, the other half aligned with MAFFT
+    # NOTE the expected outputs come from the chains: samples for which MAFFT
+    # aligns differently (see align_expect_diffs) always get their chain
+    batch = tmp_path / "batch.tsv"
+    with open(batch, "wt") as f:
+        for i, combin in enumerate(stop_combinations):
+            cols = [
+                datapath / f"{combin}.cram",
+                datapath / f"{combin}.fasta",
+                tmp_path / f"{combin}.tsv",
+            ]
+            if i & 1 or combin in align_expect_diffs:
+                cols.append(datapath / f"{combin}.chain")
+            print(*cols, sep="\t", file=f)
+
+    subprocess.check_call(
+        [
+            "frameshift_deletions_checks",
+            f"--batch={batch}",
+            "--threads=2",
+            f"--reference={datapath / 'NC_045512.2.fasta'}",
+            f"--genes={datapath / 'Genes_NC_045512.2.GFF3'}",
+        ]
+    )
+
+    # check output: must be identical to single-sample runs
+    for combin in stop_combinations:
+        exp = datapath / f"{combin}.tsv"  # expected
+        out = tmp_path / f"{combin}.tsv"  # current
+        assert [r for r in open(exp, "rt")] == [row for row in open(out, "rt")]
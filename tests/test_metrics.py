@@ -0,0 +1,74 @@
+import subprocess
+import pstats
+from pathlib import PurePath
+import json
+
+from smallgenomeutilities.__metrics__ import Metrics
+
+
+def test_stages(tmp_path):
+    out = tmp_path / "metrics.json"
+    metrics = Metrics(metrics_file=out, name="test")
+
+    for i in range(3):
+        metrics.stage("count")
+        metrics.count("reads", 10)
+        metrics.count("positions", 100)
+    with metrics.stage("write"):
+        metrics.count("files")
+    metrics.finish()
+
+    with open(out, "rt") as mf:
+        res = json.load(mf)
+
+    assert res["script"] == "test"
+    # the same stage entered several times accumulates
+    assert list(res["stages"].keys()) == ["count", "write"]
+    assert res["stages"]["count"]["calls"] == 3
+    assert res["stages"]["write"]["calls"] == 1
+    for st in res["stages"].values():
+        assert st["wall_s"] >= 0
+        assert st["cpu_s"] >= 0
+        assert st["peak_rss_MiB"] > 0
+    assert res["counters"] == {"reads": 30, "positions": 300, "files": 1}
+    assert set(res["rates"].keys()) == {"reads/s", "positions/s", "files/s"}
+
+
+def test_disabled():
+    metrics = Metrics()
+    metrics.stage("count")
+    metrics.count("reads")
+    metrics.finish()
+
+    # nothing is measured without a metrics file
+    assert metrics.stages == {}
+
+
+def test_script_metrics(tmp_path):
+    datapath = PurePath("tests/test_coverage_depth_qc")
+
+    metrics = tmp_path / "metrics.json"
+    profile = tmp_path / "profile.pstats"
+
+    subprocess.check_call(
+        [
+            "coverage_depth_qc",
+            f"--output={tmp_path / 'qc_abs.json'}",
+            f"--metrics={metrics}",
+            f"--profile={profile}",
+            datapath / "coverage.tsv",
+        ]
+    )
+
+    # output isn't affected
+    with open(datapath / "qc_abs.json", "rt") as expf, open(tmp_path / "qc_abs.json", "rt") as outf:
+        assert json.load(expf) == json.load(outf)
+
+    with open(metrics, "rt") as mf:
+        res = json.load(mf)
+    assert res["script"] == "coverage_depth_qc"
+    assert list(res["stages"].keys()) == ["load reference", "count", "write"]
+    assert res["counters"]["samples"] == 1
+
+    # the profile is readable by pstats
+    assert pstats.Stats(str(profile)).total_calls > 0
@@ -0,0 +1,92 @@
+import importlib.machinery
+import importlib.util
+import random
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+def load_script(name):
+    loader = importlib.machinery.SourceFileLoader(name, str(Path(__file__).parent.joinpath("..", "scripts", name)))
+    spec = importlib.util.spec_from_loader(name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+pair_sequences = load_script("pair_sequences")
+
+
+def calculate_distance_between_sequences(seqA, seqB):
+    """Per-character distance, as pair_sequences computed it originally"""
+    assert len(seqA) == len(seqB)
+
+    valid_loci = 0
+    mismatches = 0
+
+    for i in range(len(seqA)):
+        if seqA[i].isupper() and seqB[i].isupper():
+            valid_loci += 1
+            mismatches += pair_sequences.calculate_distance_between_bases(seqA[i], seqB[i])
+
+    if valid_loci == 0:
+        valid_loci += 1
+        mismatches += 1
+
+    return (mismatches / valid_loci, mismatches, valid_loci)
+
+
+def random_sequences(seed, num_seqs, seq_len):
+    rng = random.Random(seed)
+    alphabet = pair_sequences.IUPAC_CODES + "acgtn-"
+    return ["".join(rng.choice(alphabet) for _ in range(seq_len)) for _ in range(num_seqs)]
+
+
+def test_encode_sequences():
+    codes = pair_sequences.encode_sequences(["ACGTN", "ac-RY"])
+    invalid = pair_sequences.INVALID_CODE
+    assert codes.tolist() == [[0, 1, 2, 3, 14], [invalid, invalid, invalid, 4, 5]]
+
+    with pytest.raises(SystemExit):
+        pair_sequences.encode_sequences(["ACGTX"])
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("block_cells", [1, 7, 1 << 24])
+def test_distance_between_sequences(seed, block_cells):
+    # the last sequence has no valid locus
+    seqs = random_sequences(seed, 12, 30) + ["acgtn-" * 5]
+    mismatches, valid_loci = pair_sequences.calculate_distance_matrices(seqs, block_cells=block_cells)
+
+    for i, seqA in enumerate(seqs):
+        for j, seqB in enumerate(seqs):
+            exp = calculate_distance_between_sequences(seqA, seqB)
+            res = pair_sequences.distance_between_sequences(mismatches, valid_loci, i, j)
+            assert res[0] == pytest.approx(exp[0])
+            assert res[1] == pytest.approx(exp[1])
+            assert res[2] == exp[2]
+
+
+@pytest.mark.parametrize(
+    "recipient,first,second",
+    [
+        # 9 bases at a distance of 2/9 (and 11 equal ones) vs 1 mismatch out of 10 valid loci:
+        # both are at 0.1, but their former floating-point sums weren't
+        ("V" * 9 + "A" * 11, "A" * 20, "a" * 10 + "C" + "A" * 9),
+        # both at 11/18, but two successive divisions round them differently
+        ("BVWWSMDB", "SRBASKRW", "HDHTVAG-"),
+    ],
+)
+def test_best_match_ties(recipient, first, second):
+    for seqs in ([recipient, first, second], [recipient, second, first]):
+        mismatches, valid_loci = pair_sequences.calculate_distance_matrices(seqs)
+        distances = pair_sequences.distance_matrix(mismatches, valid_loci)
+        assert distances[0, 1] == distances[0, 2]
+        assert pair_sequences.distance_between_sequences(mismatches, valid_loci, 0, 1)[0] == distances[0, 1]
+        assert pair_sequences.distance_between_sequences(mismatches, valid_loci, 0, 2)[0] == distances[0, 2]
+
+        # ties go to the first candidate
+        assert pair_sequences.best_match(distances[0], np.array([False, True, True])) == 1
+        assert pair_sequences.best_match(distances[0], np.array([False, False, True])) == 2
+        assert pair_sequences.best_match(distances[0], np.array([False, False, False])) is None
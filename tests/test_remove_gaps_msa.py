@@ -0,0 +1,27 @@
+import subprocess
+from pathlib import PurePath
+import pytest
+
+
+@pytest.mark.parametrize(
+    "options,expected",
+    [
+        ([], "msa_filtered.fasta"),
+        (["-a", "-p", "0.75"], "msa_filtered_all.fasta"),
+    ],
+)
+@pytest.mark.parametrize("block", [["-b", "1"], []])
+def test_remove_gaps_msa(tmp_path, options, expected, block):
+    # leading/trailing gaps, lowercase bases and loci with gaps
+    datapath = PurePath("tests/test_remove_gaps_msa")
+
+    exp = datapath / expected  # expected
+    out = tmp_path / expected  # current
+
+    subprocess.check_call(
+        ["remove_gaps_msa", "-q", "-o", out] + options + block + [datapath / "msa.fasta"]
+    )
+
+    # check output, whichever number of sequences are processed at once
+    with open(exp, "rt") as expf, open(out, "rt") as outf:
+        assert [r for r in expf] == [row for row in outf]
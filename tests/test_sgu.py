@@ -0,0 +1,90 @@
+import subprocess
+import sys
+from pathlib import PurePath, Path
+import json
+import os
+import pytest
+
+from smallgenomeutilities.__dispatch__ import SUBCOMMANDS, run_subcommand
+
+script_dir = Path(__file__).parent.joinpath("..", "scripts")
+
+# modules which are slow to import and must only be loaded by the code paths that need them
+heavy_modules = {"pandas", "sklearn", "matplotlib", "Bio", "BCBio", "pysamstats", "yaml", "scipy"}
+
+
+def imported_modules(args):
+    """Return the top-level modules imported while running the command"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    # lines: "import time: self [us] | cumulative | imported package"
+    return {
+        line.rsplit("|", 1)[1].strip().split(".")[0]
+        for line in proc.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+@pytest.mark.parametrize("script", SUBCOMMANDS + ("sgu",))
+def test_help_imports(script):
+    # displaying the help must not pull in any of the heavy dependencies
+    loaded = imported_modules([script_dir / script, "--help"])
+    assert not (loaded & heavy_modules), f"{script} imports {loaded & heavy_modules}"
+
+
+def test_sgu_manifest(tmp_path):
+    datapath = PurePath("tests/test_coverage_depth_qc")
+
+    manifest = tmp_path / "manifest.txt"
+    with open(manifest, "wt") as mf:
+        print("# coverage QC of all samples", file=mf)
+        print(f"coverage_depth_qc --output={tmp_path / 'qc_abs.json'} {datapath / 'coverage.tsv'}", file=mf)
+        print("", file=mf)
+        print(
+            f"coverage_depth_qc --output={tmp_path / 'qc_rel.json'} -f {datapath / 'chrom.size'} -d 5,10 -d 15 -n got -- {datapath / 'coverage.tsv'}",
+            file=mf,
+        )
+
+    subprocess.check_call(["sgu", "--manifest", manifest])
+
+    # check output
+    for f in ("qc_abs.json", "qc_rel.json"):
+        with open(datapath / f, "rt") as expf, open(tmp_path / f, "rt") as outf:
+            assert json.load(expf) == json.load(outf)
+
+
+def test_sgu_failure(tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    with open(manifest, "wt") as mf:
+        print("coverage_depth_qc", file=mf)  # missing arguments
+        print("not_a_subcommand", file=mf)
+        print(f"coverage_depth_qc --output={tmp_path / 'qc.json'} tests/test_coverage_depth_qc/coverage.tsv", file=mf)
+
+    # stop at the first failure
+    assert subprocess.run(["sgu", "--manifest", manifest]).returncode != 0
+    assert not (tmp_path / "qc.json").exists()
+
+    # run everything, but still report the failures
+    assert subprocess.run(["sgu", "--keep-going", "--manifest", manifest]).returncode != 0
+    assert (tmp_path / "qc.json").exists()
+
+
+def test_sgu_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv("REF_CACHE", raising=False)
+    datapath = PurePath("tests/test_paired_end_read_merger")
+
+    # --ref-cache sets REF_CACHE for the run only, not for the next ones in the same interpreter
+    status = run_subcommand(
+        "paired_end_read_merger",
+        [f"--output={tmp_path / 'mini_merged.sam'}", f"--ref-cache={tmp_path / 'ref_cache'}", str(datapath / "mini.sam")],
+        script_dir,
+    )
+    assert status == 0
+    assert "REF_CACHE" not in os.environ
+
+    with open(datapath / "mini_merged.sam", "rt") as expf, open(tmp_path / "mini_merged.sam", "rt") as outf:
+        assert [r for r in expf] == [row for row in outf]